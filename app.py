@@ -1,20 +1,32 @@
 import os
-import json
+import re
+import atexit
+import hashlib
+import mimetypes
 import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import quote
 
+import orjson
 from flask import (
     Flask,
+    Response,
+    abort,
     g,
     render_template,
     request,
     redirect,
     url_for,
     session,
-    jsonify,
     send_from_directory,
 )
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_caching import Cache
+from passlib.context import CryptContext
+from werkzeug.security import check_password_hash, generate_password_hash, safe_join
 
 BASE_DIR = os.path.dirname(__file__)
 APP_DB = os.path.join(BASE_DIR, "academic.db")
@@ -23,18 +35,78 @@ os.makedirs(DATA_DIR, exist_ok=True)
 
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+CONTENT_ADDRESSED_RE = re.compile(r"[0-9a-f]{32}(\.[a-z0-9]+)?")
+UPLOAD_EXT_RE = re.compile(r"[a-z0-9]+")
 
 app = Flask(__name__)
 app.secret_key = "change-this-secret"
 
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16 MB
+# Only send Set-Cookie when the session actually changed, even if sessions
+# are made permanent later on.
+app.config["SESSION_REFRESH_EACH_REQUEST"] = False
+# When set (e.g. "/_uploads/"), /uploads/ responses hand the file off to the
+# reverse proxy with X-Accel-Redirect. The prefix must be an nginx
+# `internal` location whose alias is UPLOAD_FOLDER.
+app.config["UPLOADS_ACCEL_REDIRECT"] = os.environ.get("UPLOADS_ACCEL_REDIRECT", "")
+
+cache = Cache(app, config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": 60})
+
+SQL_USER_BY_EMAIL = "SELECT id, email, password_hash, is_admin FROM users WHERE email=?"
+SQL_ADMIN_BY_EMAIL = SQL_USER_BY_EMAIL + " AND is_admin=1"
+SQL_INSERT_USER = "INSERT INTO users (email, password_hash) VALUES (?, ?)"
+SQL_UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash=? WHERE id=?"
+
+pwd_ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12, deprecated="auto")
+# bcrypt releases the GIL, so hashes run in parallel on this pool while the
+# number of concurrent hashes stays bounded by the CPU count. Deploy with a
+# threaded worker (e.g. gunicorn --worker-class gthread --threads 8) so other
+# requests keep being served while a login waits on its hash.
+HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+# Verified against in place of a real hash, so that failed logins take the
+# same time whether or not the account exists and whatever its hash type.
+DUMMY_HASH = pwd_ctx.hash("x")
+DUMMY_LEGACY_HASH = generate_password_hash("x")
+
+
+# Idle connections are kept here between requests so each one keeps its
+# PRAGMAs and statement cache instead of being reopened every time.
+_db_pool = []
+_db_pool_all = []
+_db_pool_lock = threading.Lock()
+
+
+def _py_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _connect_db():
+    db = sqlite3.connect(APP_DB, cached_statements=256, check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    # SQLite's lower() only folds ASCII; searches lowercase their input with
+    # str.lower(), so columns must be folded the same way to match.
+    db.create_function("py_lower", 1, _py_lower, deterministic=True)
+    db.executescript(
+        """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA foreign_keys=ON;
+    """
+    )
+    with _db_pool_lock:
+        _db_pool_all.append(db)
+    return db
 
 
 def get_db():
     if "db" not in g:
-        g.db = sqlite3.connect(APP_DB)
-        g.db.row_factory = sqlite3.Row
+        with _db_pool_lock:
+            db = _db_pool.pop() if _db_pool else None
+        g.db = db or _connect_db()
     return g.db
 
 
@@ -42,20 +114,38 @@ def get_db():
 def close_db(_):
     db = g.pop("db", None)
     if db:
-        db.close()
+        # Anything the view did not commit is discarded, as closing did.
+        if db.in_transaction:
+            db.rollback()
+        with _db_pool_lock:
+            _db_pool.append(db)
 
 
-def init_db():
-    db = get_db()
-    db.executescript(
-        """
+@atexit.register
+def close_db_pool():
+    with _db_pool_lock:
+        for db in _db_pool_all:
+            db.close()
+        _db_pool_all.clear()
+        _db_pool.clear()
+
+
+# Databases already at this version skip setup entirely on boot; bump it
+# whenever SCHEMA changes.
+SCHEMA_VERSION = 1
+
+# Kept as separate statements rather than one script: init_db runs them
+# inside BEGIN IMMEDIATE, and executescript() would COMMIT first.
+SCHEMA = (
+    """
     CREATE TABLE IF NOT EXISTS users (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         email TEXT UNIQUE NOT NULL,
         password_hash TEXT NOT NULL,
         is_admin INTEGER DEFAULT 0
-    );
-
+    )
+    """,
+    """
     CREATE TABLE IF NOT EXISTS scholarships (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT NOT NULL,
@@ -71,10 +161,37 @@ def init_db():
         is_international_only INTEGER DEFAULT 0,
         image_filename TEXT,
         brochure_filename TEXT
-    );
-    """
     )
-    db.commit()
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sch_country ON scholarships(country)",
+    "CREATE INDEX IF NOT EXISTS idx_sch_level ON scholarships(level)",
+    "CREATE INDEX IF NOT EXISTS idx_sch_field ON scholarships(field)",
+    "CREATE INDEX IF NOT EXISTS idx_sch_intl ON scholarships(is_international_only)",
+    "CREATE INDEX IF NOT EXISTS idx_sch_deadline ON scholarships(deadline)",
+)
+
+
+def init_db():
+    db = get_db()
+    if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    # Schema, admin account and seed data go in one transaction, so a fresh
+    # database costs a single commit. BEGIN IMMEDIATE makes a second process
+    # booting at the same time wait here, then see the new user_version.
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            db.rollback()
+            return
+        for statement in SCHEMA:
+            db.execute(statement)
+        seed_admin()
+        seed_scholarships_from_json()
+        db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
 
 def seed_admin():
@@ -85,9 +202,8 @@ def seed_admin():
         pwd = "admin123"
         db.execute(
             "INSERT INTO users (email, password_hash, is_admin) VALUES (?, ?, 1)",
-            (email, generate_password_hash(pwd)),
+            (email, pwd_ctx.hash(pwd)),
         )
-        db.commit()
         print(f"[INFO] Admin created: {email} / {pwd} (change this!)")
 
 
@@ -99,29 +215,121 @@ def seed_scholarships_from_json():
         return
     if not os.path.exists(path):
         return
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    for s in data:
-        checklist = "\n".join(s.get("checklist", []))
-        db.execute(
-            """
-            INSERT INTO scholarships (name, country, deadline, link, checklist)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (s["name"], s["country"], s.get("deadline"), s["link"], checklist),
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    rows = [
+        (
+            s["name"],
+            s["country"],
+            s.get("deadline"),
+            s["link"],
+            "\n".join(s.get("checklist", [])),
         )
-    db.commit()
+        for s in data
+    ]
+    db.executemany(
+        """
+        INSERT INTO scholarships (name, country, deadline, link, checklist)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
     print("[INFO] Seeded scholarships from JSON.")
 
 
+def normalize_email(email):
+    return email.strip().lower()
+
+
+def verify_password(password, password_hash):
+    # Every call runs one bcrypt verify and one werkzeug check, using the
+    # dummy hashes for whichever the account does not need, so response
+    # time reveals neither whether the account exists (password_hash is
+    # None) nor whether it still has a pre-bcrypt werkzeug hash.
+    if password_hash is None:
+        pwd_ctx.verify(password, DUMMY_HASH)
+        check_password_hash(DUMMY_LEGACY_HASH, password)
+        return False
+    if pwd_ctx.identify(password_hash, required=False) is None:
+        pwd_ctx.verify(password, DUMMY_HASH)
+        return check_password_hash(password_hash, password)
+    check_password_hash(DUMMY_LEGACY_HASH, password)
+    return pwd_ctx.verify(password, password_hash)
+
+
+def upgrade_password_hash(db, user_id, password, password_hash):
+    if (
+        pwd_ctx.identify(password_hash, required=False) is None
+        or pwd_ctx.needs_update(password_hash)
+    ):
+        new_hash = HASH_POOL.submit(pwd_ctx.hash, password).result()
+        db.execute(SQL_UPDATE_PASSWORD_HASH, (new_hash, user_id))
+        db.commit()
+
+
+def clear_scholarship_cache():
+    # Cached list pages are keyed by a hash of the query string, so they
+    # cannot be deleted one by one; everything cached is scholarship data.
+    cache.clear()
+
+
+def save_upload(file_storage):
+    # Uploads are stored under a hash of their contents, so re-uploading the
+    # same file reuses the existing copy and a stored name never changes.
+    data = file_storage.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    # Only the extension of the client filename is kept. secure_filename()
+    # would drop a non-ASCII stem together with the dot ("файл.pdf" -> "pdf").
+    ext = os.path.splitext(file_storage.filename)[1][1:].lower()
+    if not UPLOAD_EXT_RE.fullmatch(ext):
+        ext = ""
+    filename = f"{digest}.{ext}" if ext else digest
+    path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
+    if not os.path.exists(path):
+        # Write to a temp file and rename it into place, so a digest-named
+        # file only ever exists with its complete contents; a failed write
+        # would otherwise be served and cached as immutable.
+        with tempfile.NamedTemporaryFile(
+            dir=app.config["UPLOAD_FOLDER"], prefix=".upload-", delete=False
+        ) as f:
+            tmp_path = f.name
+            try:
+                f.write(data)
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        # NamedTemporaryFile creates files as 0600; a proxy serving uploads
+        # via X-Accel-Redirect needs to read them.
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    return filename
+
+
+def normalize_deadline(value):
+    # Dates typed without zero padding (2024-1-5) are stored as YYYY-MM-DD so
+    # the deadline sort recognises them; free text is kept as entered.
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return value
+
+
+def like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 def current_user():
-    if "user_id" in session:
-        return {
-            "id": session["user_id"],
-            "email": session.get("user_email"),
-            "is_admin": session.get("is_admin", 0),
-        }
-    return None
+    if "user" not in g:
+        if "user_id" in session:
+            g.user = {
+                "id": session["user_id"],
+                "email": session.get("user_email"),
+                "is_admin": session.get("is_admin", 0),
+            }
+        else:
+            g.user = None
+    return g.user
 
 
 def login_required(f):
@@ -145,6 +353,25 @@ def admin_required(f):
     return wrapper
 
 
+@app.after_request
+def add_public_cache_headers(response):
+    # Lets a CDN or browser reuse the scholarship lists for as long as the
+    # server-side cache would. The HTML page shows the logged-in email, so
+    # it is only public for anonymous visitors.
+    if response.status_code == 200 and (
+        request.endpoint == "api_scholarships"
+        or (request.endpoint == "scholarships" and "user_id" not in session)
+    ):
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+    return response
+
+
+@app.template_filter("splitlines")
+def splitlines_filter(value):
+    return value.splitlines() if value else []
+
+
 @app.route("/")
 def home():
     return render_template("home.html")
@@ -153,23 +380,20 @@ def home():
 @app.route("/signup", methods=["GET", "POST"])
 def signup():
     if request.method == "POST":
-        email = request.form["email"].strip().lower()
+        email = normalize_email(request.form["email"])
         password = request.form["password"]
         if len(password) < 6:
             return render_template(
                 "signup.html", error="Password must be at least 6 characters."
             )
+        password_hash = HASH_POOL.submit(pwd_ctx.hash, password).result()
         db = get_db()
         try:
-            db.execute(
-                "INSERT INTO users (email, password_hash) VALUES (?, ?)",
-                (email, generate_password_hash(password)),
-            )
+            cur = db.execute(SQL_INSERT_USER, (email, password_hash))
             db.commit()
         except sqlite3.IntegrityError:
             return render_template("signup.html", error="Email already registered.")
-        row = db.execute("SELECT id FROM users WHERE email=?", (email,)).fetchone()
-        session["user_id"] = row["id"]
+        session["user_id"] = cur.lastrowid
         session["user_email"] = email
         session["is_admin"] = 0
         return redirect(url_for("home"))
@@ -179,12 +403,14 @@ def signup():
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
-        email = request.form["email"].strip().lower()
+        email = normalize_email(request.form["email"])
         password = request.form["password"]
         db = get_db()
-        row = db.execute("SELECT * FROM users WHERE email=?", (email,)).fetchone()
-        if not row or not check_password_hash(row["password_hash"], password):
+        row = db.execute(SQL_USER_BY_EMAIL, (email,)).fetchone()
+        password_hash = row["password_hash"] if row else None
+        if not HASH_POOL.submit(verify_password, password, password_hash).result():
             return render_template("login.html", error="Invalid email or password.")
+        upgrade_password_hash(db, row["id"], password, row["password_hash"])
         session["user_id"] = row["id"]
         session["user_email"] = row["email"]
         session["is_admin"] = row["is_admin"]
@@ -199,9 +425,12 @@ def logout():
 
 
 @app.route("/api/scholarships")
+@cache.cached()
 def api_scholarships():
     db = get_db()
-    rows = db.execute("SELECT * FROM scholarships").fetchall()
+    rows = db.execute(
+        "SELECT id, name, country, deadline, link, checklist FROM scholarships"
+    ).fetchall()
     items = []
     for r in rows:
         items.append(
@@ -216,43 +445,45 @@ def api_scholarships():
                 else [],
             }
         )
-    return jsonify(items)
+    return Response(orjson.dumps(items), mimetype="application/json")
 
 
 @app.route("/scholarships")
+@cache.cached(query_string=True, unless=lambda: "user_id" in session)
 def scholarships():
     q = request.args.get("q", "").strip().lower()
     country = request.args.get("country", "").strip().lower()
     sort = request.args.get("sort", "")
-    db = get_db()
-    rows = db.execute("SELECT * FROM scholarships").fetchall()
-    items = []
-    for r in rows:
-        item = dict(r)
-        item["checklist"] = (
-            (r["checklist"] or "").splitlines() if r["checklist"] else []
-        )
-        items.append(item)
+
+    query = (
+        "SELECT id, name, country, university, level, deadline, link"
+        " FROM scholarships WHERE 1=1"
+    )
+    params = []
 
     if q:
-        items = [s for s in items if q in s["name"].lower()]
+        query += " AND py_lower(name) LIKE ? ESCAPE '\\'"
+        params.append(f"%{like_escape(q)}%")
     if country:
-        items = [s for s in items if country in s["country"].lower()]
-
-    def parse_date(s):
-        try:
-            return datetime.strptime(s, "%Y-%m-%d")
-        except Exception:
-            return None
-
+        query += " AND py_lower(country) LIKE ? ESCAPE '\\'"
+        params.append(f"%{like_escape(country)}%")
+
+    # Only valid, zero-padded YYYY-MM-DD deadlines count as dates: date()
+    # reads a bare number such as 2025 as a Julian day, and the '+0 days'
+    # modifier rolls impossible days like 02-30 over so they fail the
+    # comparison. Everything else sorts last in both directions.
+    deadline_order = (
+        " ORDER BY CASE WHEN date(deadline, '+0 days') = deadline THEN 0 ELSE 1 END,"
+        " deadline"
+    )
     if sort == "deadline_asc":
-        items.sort(key=lambda s: (parse_date(s["deadline"]) or datetime.max))
+        query += deadline_order + " ASC, id"
     elif sort == "deadline_desc":
-        items.sort(
-            key=lambda s: (parse_date(s["deadline"]) or datetime.min), reverse=True
-        )
+        query += deadline_order + " DESC, id"
 
-    return render_template("scholarships.html", scholarships=items)
+    db = get_db()
+    rows = db.execute(query, params).fetchall()
+    return render_template("scholarships.html", scholarships=rows)
 
 
 @app.route("/scholarships/<int:sid>")
@@ -261,24 +492,22 @@ def scholarship_detail(sid):
     r = db.execute("SELECT * FROM scholarships WHERE id=?", (sid,)).fetchone()
     if not r:
         return redirect(url_for("scholarships"))
-    s = dict(r)
-    s["checklist"] = (r["checklist"] or "").splitlines() if r["checklist"] else []
-    return render_template("scholarship_detail.html", s=s)
+    return render_template("scholarship_detail.html", s=r)
 
 
 @app.route("/admin/login", methods=["GET", "POST"])
 def admin_login():
     if request.method == "POST":
-        email = request.form["email"].strip().lower()
+        email = normalize_email(request.form["email"])
         password = request.form["password"]
         db = get_db()
-        row = db.execute(
-            "SELECT * FROM users WHERE email=? AND is_admin=1", (email,)
-        ).fetchone()
-        if not row or not check_password_hash(row["password_hash"], password):
+        row = db.execute(SQL_ADMIN_BY_EMAIL, (email,)).fetchone()
+        password_hash = row["password_hash"] if row else None
+        if not HASH_POOL.submit(verify_password, password, password_hash).result():
             return render_template(
                 "admin_login.html", error="Invalid admin credentials."
             )
+        upgrade_password_hash(db, row["id"], password, row["password_hash"])
         session["user_id"] = row["id"]
         session["user_email"] = row["email"]
         session["is_admin"] = 1
@@ -290,15 +519,10 @@ def admin_login():
 @admin_required
 def admin_dashboard():
     db = get_db()
-    rows = db.execute("SELECT * FROM scholarships ORDER BY id DESC").fetchall()
-    items = []
-    for r in rows:
-        item = dict(r)
-        item["checklist"] = (
-            (r["checklist"] or "").splitlines() if r["checklist"] else []
-        )
-        items.append(item)
-    return render_template("admin_dashboard.html", scholarships=items)
+    rows = db.execute(
+        "SELECT id, name, country, level, deadline FROM scholarships ORDER BY id DESC"
+    ).fetchall()
+    return render_template("admin_dashboard.html", scholarships=rows)
 
 
 @app.route("/admin/add", methods=["GET", "POST"])
@@ -311,7 +535,9 @@ def add_scholarship():
         level = request.form.get("level", "").strip()
         field = request.form.get("field", "").strip()
         tags = request.form.get("tags", "").strip()
-        deadline = request.form.get("deadline", "").strip() or None
+        deadline = (
+            normalize_deadline(request.form.get("deadline", "").strip()) or None
+        )
         link = request.form["link"].strip()
         checklist = request.form.get("checklist", "").strip()
         min_gpa_raw = request.form.get("min_gpa", "").strip()
@@ -327,14 +553,10 @@ def add_scholarship():
         brochure_filename = None
 
         if image_file and image_file.filename:
-            image_filename = f"img_{name.replace(' ', '_')}_{image_file.filename}"
-            image_path = os.path.join(app.config["UPLOAD_FOLDER"], image_filename)
-            image_file.save(image_path)
+            image_filename = save_upload(image_file)
 
         if brochure_file and brochure_file.filename:
-            brochure_filename = f"doc_{name.replace(' ', '_')}_{brochure_file.filename}"
-            brochure_path = os.path.join(app.config["UPLOAD_FOLDER"], brochure_filename)
-            brochure_file.save(brochure_path)
+            brochure_filename = save_upload(brochure_file)
 
         db = get_db()
         db.execute(
@@ -361,6 +583,7 @@ def add_scholarship():
             ),
         )
         db.commit()
+        clear_scholarship_cache()
         return redirect(url_for("admin_dashboard"))
 
     return render_template("add_edit_scholarship.html", s=None)
@@ -381,7 +604,9 @@ def edit_scholarship(sid):
         level = request.form.get("level", "").strip()
         field = request.form.get("field", "").strip()
         tags = request.form.get("tags", "").strip()
-        deadline = request.form.get("deadline", "").strip() or None
+        deadline = (
+            normalize_deadline(request.form.get("deadline", "").strip()) or None
+        )
         link = request.form["link"].strip()
         checklist = request.form.get("checklist", "").strip()
         min_gpa_raw = request.form.get("min_gpa", "").strip()
@@ -397,14 +622,10 @@ def edit_scholarship(sid):
         brochure_filename = r["brochure_filename"]
 
         if image_file and image_file.filename:
-            image_filename = f"img_{name.replace(' ', '_')}_{image_file.filename}"
-            image_path = os.path.join(app.config["UPLOAD_FOLDER"], image_filename)
-            image_file.save(image_path)
+            image_filename = save_upload(image_file)
 
         if brochure_file and brochure_file.filename:
-            brochure_filename = f"doc_{name.replace(' ', '_')}_{brochure_file.filename}"
-            brochure_path = os.path.join(app.config["UPLOAD_FOLDER"], brochure_filename)
-            brochure_file.save(brochure_path)
+            brochure_filename = save_upload(brochure_file)
 
         db.execute(
             """
@@ -432,40 +653,112 @@ def edit_scholarship(sid):
             ),
         )
         db.commit()
+        clear_scholarship_cache()
         return redirect(url_for("admin_dashboard"))
 
-    s = dict(r)
-    s["checklist"] = (r["checklist"] or "").splitlines() if r["checklist"] else []
-    return render_template("add_edit_scholarship.html", s=s)
+    return render_template("add_edit_scholarship.html", s=r)
 
 
 @app.route("/uploads/<path:filename>")
 def uploaded_file(filename):
+    immutable = CONTENT_ADDRESSED_RE.fullmatch(filename)
+    accel_prefix = app.config["UPLOADS_ACCEL_REDIRECT"]
+    if accel_prefix:
+        path = safe_join(app.config["UPLOAD_FOLDER"], filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        # The proxy sends the file itself; this response only carries headers.
+        response = Response(
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        )
+        if immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = 31536000
+            response.set_etag(filename.split(".", 1)[0])
+            response.make_conditional(request)
+        if response.status_code != 304:
+            response.headers["X-Accel-Redirect"] = accel_prefix + quote(filename)
+        return response
+    if immutable:
+        return send_from_directory(
+            app.config["UPLOAD_FOLDER"],
+            filename,
+            max_age=31536000,
+            etag=filename.split(".", 1)[0],
+        )
+    # Files saved before content-addressed naming can be overwritten in place.
     return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
 
 
-@app.route("/eligibility", methods=["GET", "POST"])
-def eligibility():
-    db = get_db()
-    countries = [
+@cache.memoize(300)
+def _distinct_countries():
+    return [
         row["country"]
-        for row in db.execute(
+        for row in get_db().execute(
             "SELECT DISTINCT country FROM scholarships WHERE country IS NOT NULL AND country != ''"
         ).fetchall()
     ]
-    levels = [
+
+
+@cache.memoize(300)
+def _distinct_levels():
+    return [
         row["level"]
-        for row in db.execute(
+        for row in get_db().execute(
             "SELECT DISTINCT level FROM scholarships WHERE level IS NOT NULL AND level != ''"
         ).fetchall()
     ]
-    fields = [
+
+
+@cache.memoize(300)
+def _distinct_fields():
+    return [
         row["field"]
-        for row in db.execute(
+        for row in get_db().execute(
             "SELECT DISTINCT field FROM scholarships WHERE field IS NOT NULL AND field != ''"
         ).fetchall()
     ]
 
+
+@lru_cache(maxsize=64)
+def _build_eligibility_query(columns, mask):
+    query = f"SELECT {columns} FROM scholarships WHERE 1=1"
+    if mask & 1:
+        query += " AND country = ?"
+    if mask & 2:
+        query += " AND level = ?"
+    if mask & 4:
+        query += " AND field = ?"
+    if mask & 8:
+        query += " AND is_international_only = 1"
+    if mask & 16:
+        query += " AND (min_gpa IS NULL OR min_gpa <= ?)"
+    return query
+
+
+def eligibility_query(columns, country, level, field, is_international, gpa):
+    # The SQL text only depends on which filters are filled in, so it is
+    # built once per combination and the values are bound in a fixed order.
+    mask = (
+        bool(country)
+        | bool(level) << 1
+        | bool(field) << 2
+        | bool(is_international) << 3
+        | (gpa is not None) << 4
+    )
+    params = [value for value in (country, level, field) if value]
+    if gpa is not None:
+        params.append(gpa)
+    return _build_eligibility_query(columns, mask), params
+
+
+@app.route("/eligibility", methods=["GET", "POST"])
+def eligibility():
+    db = get_db()
+    countries = _distinct_countries()
+    levels = _distinct_levels()
+    fields = _distinct_fields()
+
     results = []
 
     if request.method == "POST":
@@ -476,31 +769,15 @@ def eligibility():
         gpa = float(gpa_raw) if gpa_raw else None
         is_international = request.form.get("is_international") == "on"
 
-        query = "SELECT * FROM scholarships WHERE 1=1"
-        params = []
-
-        if country:
-            query += " AND country = ?"
-            params.append(country)
-        if level:
-            query += " AND level = ?"
-            params.append(level)
-        if field:
-            query += " AND field = ?"
-            params.append(field)
-        if is_international:
-            query += " AND is_international_only = 1"
-
-        rows = db.execute(query, params).fetchall()
-
-        for r in rows:
-            if gpa is not None and r["min_gpa"] is not None:
-                try:
-                    if gpa < float(r["min_gpa"]):
-                        continue
-                except Exception:
-                    pass
-            results.append(dict(r))
+        query, params = eligibility_query(
+            "id, name, country, level, deadline",
+            country,
+            level,
+            field,
+            is_international,
+            gpa,
+        )
+        results = db.execute(query, params).fetchall()
 
     return render_template(
         "eligibility.html",
@@ -519,38 +796,28 @@ def api_eligibility():
     level = data.get("level", "").strip()
     field = data.get("field", "").strip()
     gpa = data.get("gpa", None)
+    try:
+        gpa = float(gpa) if gpa is not None else None
+    except (TypeError, ValueError):
+        gpa = None
     is_international = data.get("is_international", False)
 
     db = get_db()
 
-    query = "SELECT * FROM scholarships WHERE 1=1"
-    params = []
-
-    if country:
-        query += " AND country = ?"
-        params.append(country)
-    if level:
-        query += " AND level = ?"
-        params.append(level)
-    if field:
-        query += " AND field = ?"
-        params.append(field)
-    if is_international:
-        query += " AND is_international_only = 1"
-
+    query, params = eligibility_query(
+        "id, name, country, university, level, field, tags, deadline,"
+        " min_gpa, is_international_only, link",
+        country,
+        level,
+        field,
+        is_international,
+        gpa,
+    )
     rows = db.execute(query, params).fetchall()
 
     results = []
 
     for r in rows:
-        min_gpa = r["min_gpa"]
-        if gpa is not None and min_gpa is not None:
-            try:
-                if float(gpa) < float(min_gpa):
-                    continue
-            except Exception:
-                pass
-
         results.append(
             {
                 "id": r["id"],
@@ -567,12 +834,10 @@ def api_eligibility():
             }
         )
 
-    return jsonify(results)
+    return Response(orjson.dumps(results), mimetype="application/json")
 
 
 if __name__ == "__main__":
     with app.app_context():
         init_db()
-        seed_admin()
-        seed_scholarships_from_json()
     app.run(host="0.0.0.0", port=5000, debug=True)